@@ -1,16 +1,99 @@
+import atexit
 import mimetypes
+import os
 import re
 from calendar import month_name
-from datetime import datetime
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from os import PathLike
 from pathlib import Path
 from shutil import copy2, move
+from threading import Lock
+from time import localtime, strftime, strptime
 from typing import Union, Callable
 
 from PIL import Image, UnidentifiedImageError
-from PIL.ExifTags import TAGS
 from pymediainfo import MediaInfo
 
+# matches the "(n)" counter added to duplicate file names
+_DUPE_RE = re.compile(r"\((\d+)\)")
+
+# lowercase month folder names, indexed by struct_time.tm_mon - 1
+_MONTHS = [month.lower() for month in month_name[1:]]
+
+# sorted files are named after their date, e.g. "10-01-2013 [09.17.50].jpg"
+_FILE_NAME_FORMAT = "%m-%d-%Y [%H.%M.%S]"
+
+# numeric exif tag ids, looked up directly instead of building a name -> value dict of every tag
+_EXIF_IFD_TAG = 0x8769
+_DATE_TIME_ORIGINAL_TAG = 0x9003
+
+# leading bytes of common image/video containers, anything that doesn't match is left to mediainfo (so are
+# containers like matroska/webm that can just as well hold audio only)
+_MAGICS = (
+    (b"\xff\xd8\xff", "Image"),  # jpeg
+    (b"\x89PNG\r\n\x1a\n", "Image"),
+    (b"GIF87a", "Image"),
+    (b"GIF89a", "Image"),
+    (b"II*\x00", "Image"),  # tiff (and tiff based raw formats) little endian
+    (b"MM\x00*", "Image"),  # tiff (and tiff based raw formats) big endian
+    (b"\x00\x00\x01\xba", "Video"),  # mpeg program stream
+    (b"\x00\x00\x01\xb3", "Video"),  # mpeg-1/2 video
+)
+
+# RIFF form type (bytes 8-12), others such as WAVE are left to mediainfo
+_RIFF_TYPES = {b"WEBP": "Image", b"AVI ": "Video"}
+
+# ISO-BMFF "ftyp" major brands (bytes 8-12), any other brand (e.g. M4A audio) is left to mediainfo
+_FTYP_IMAGE_BRANDS = {
+    b"avif",
+    b"avis",
+    b"heic",
+    b"heim",
+    b"heis",
+    b"heix",
+    b"hevc",
+    b"hevx",
+    b"mif1",
+    b"msf1",
+}
+
+# generic brands such as isom, mp41/mp42 and 3gp4-6 are also used for audio only files so they aren't listed
+_FTYP_VIDEO_BRANDS = {
+    b"M4V ",
+    b"M4VH",
+    b"M4VP",
+    b"MSNV",
+    b"XAVC",
+    b"avc1",
+    b"f4v ",
+    b"qt  ",
+}
+
+# bytes read from the start of each file for the signature checks, mediainfo still parses the whole file
+_HEADER_SIZE = 65536
+
+# file inspection is mostly blocking I/O (mediainfo, exif headers) so use more threads than cores
+_MAX_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# files queued on the thread pool at once, enough to keep the workers busy without reading the whole walk ahead
+_MAX_PENDING = _MAX_WORKERS * 4
+
+# libmediainfo isn't thread safe (concurrent parses can crash), only one parse may run at a time
+_MEDIA_INFO_LOCK = Lock()
+
+
+@lru_cache(maxsize=4096)
+def _mime_for_suffix(suffix):
+    """mimetypes only looks at the extension, so cache its guess per (lowercase) suffix"""
+    return mimetypes.guess_type("x" + suffix)[0] or ""
+
+
+def _print_progress(progress_info):
+    """prints progress to the console when parse_dir isn't given a callback"""
+    print(progress_info.get("string", progress_info))
+
 
 class ImageOrganizer:
     def __init__(
@@ -23,9 +106,9 @@ class ImageOrganizer:
         fast_parse: bool = False,
     ):
         """
-        Sorts files to images, videos, and unknown. By default (fast_parse=False) it will use the mediainfo library
-        to correctly parse all files to see if they are an image or video. Anything that is not an image or video is
-        sorted into the unknown directory.
+        Sorts files to images, videos, and unknown. By default (fast_parse=False) it will check the file header for
+        common image/video formats and use the mediainfo library to correctly parse any other file to see if it is an
+        image or video. Anything that is not an image or video is sorted into the unknown directory.
 
         :param working_directory: Full path for the output of the sorted files.
         :param image_dir_name: A string for the image folder-name.
@@ -58,22 +141,42 @@ class ImageOrganizer:
         self.total_videos = 0
         self.total_unknown = 0
 
+        # normalized working_directory, the walk skips it when it's inside the parsed directory
+        self._output_path = os.path.normcase(os.path.abspath(self.working_dir))
+
+        # year/month folder -> names of the files in it, filled the first time the folder is used
+        self._dest_index = {}
+
+        # year/month folder -> last duplicate counter used in it
+        self._dupe_counters = {}
+
         # make directories
         self._make_directories()
 
+        # one exception log per job, opened on the first exception and shared by the worker threads
+        self._error_log_path = os.path.join(
+            self.working_dir,
+            "exception_log " + strftime("%b-%d-%Y [%H.%M.%S]") + ".txt",
+        )
+        self._error_log = None
+        self._error_log_lock = Lock()
+
+        # media type -> sorting directory, anything else is sorted into unknown
+        self._dest = {"Image": self.image_dir, "Video": self.video_dir}
+
     def _make_directories(self):
         """creates sorting directories if not known"""
         root_directory = Path(self.working_dir)
-        Path(root_directory).mkdir(parents=True, exist_ok=True)
+        root_directory.mkdir(parents=True, exist_ok=True)
 
-        Path(root_directory / self.image_dir_name).mkdir(exist_ok=True)
-        self.image_dir = Path(root_directory / self.image_dir_name)
+        self.image_dir = root_directory / self.image_dir_name
+        self.image_dir.mkdir(exist_ok=True)
 
-        Path(root_directory / self.video_dir_name).mkdir(exist_ok=True)
-        self.video_dir = Path(root_directory / self.video_dir_name)
+        self.video_dir = root_directory / self.video_dir_name
+        self.video_dir.mkdir(exist_ok=True)
 
-        Path(root_directory / self.unknown_dir_name).mkdir(exist_ok=True)
-        self.unknown_dir = Path(root_directory / self.unknown_dir_name)
+        self.unknown_dir = root_directory / self.unknown_dir_name
+        self.unknown_dir.mkdir(exist_ok=True)
 
     def parse_dir(
         self,
@@ -92,83 +195,69 @@ class ImageOrganizer:
         :return: None
         """
 
-        glob_dir = []
-
-        # use rglob if recursively searched
-        if recursive_search:
-            glob_dir = [x for x in sorted(Path(dir_path).rglob("*.*"))]
-        elif not recursive_search:
-            glob_dir = [x for x in sorted(Path(dir_path).glob("*.*"))]
+        # work out where progress goes once, instead of on every file
+        emit_progress = None
+        if callable(callback):
+            emit_progress = callback
+        elif get_progress:
+            emit_progress = _print_progress
+
+        # walk once, keeping the stat results scandir already fetched, the walk is streamed unless progress
+        # needs the total number of files up front
+        glob_dir = self._walk(dir_path, recursive_search)
+        total_dir_files = 0
+        if emit_progress:
+            glob_dir = list(glob_dir)
+            total_dir_files = len(glob_dir)
 
         # needed variables
-        total_dir_files = len(glob_dir)
         progress = 1
 
-        # search the director(y/ies)
-        for searched_file in glob_dir:
-            if Path(searched_file).is_file():
+        # progress is only reported about 1000 times per run (and always for the last file)
+        progress_step = max(1, total_dir_files // 1000)
+        total_dir_files_str = str(total_dir_files)
+        inv_total_dir_files = 1.0 / max(1, total_dir_files)
+
+        # media type/exif detection runs on worker threads, the results are sorted here
+        # in order so folder creation and duplicate counters stay single threaded
+        with ThreadPoolExecutor(max_workers=_MAX_WORKERS) as executor:
+            for (
+                searched_file,
+                media_type,
+                file_creation_date,
+            ) in self._inspect_all(executor, glob_dir):
 
                 # handle progress/callback information here
-                if get_progress or callback:
-                    if not callable(callback):
-                        print(
-                            "Processing file "
-                            + str(progress)
-                            + " of "
-                            + str(total_dir_files)
-                        )
-                    elif callable(callback):
-                        callback(
-                            {
-                                "string": "Processing file "
-                                + str(progress)
-                                + " of "
-                                + str(total_dir_files),
-                                "percent": str(
-                                    "{:.1%}".format(
-                                        int(progress) / int(total_dir_files)
-                                    )
-                                ),
-                            }
-                        )
-
-                    # determine media type
-                    media_type = None
-                    if not self.fast_parse:
-                        media_type = self._check_filetype_media_info(searched_file)
-                    elif self.fast_parse:
-                        media_type = self._check_filetype_mime(searched_file)
-
-                    # attempt to get exif data
-                    file_creation_date = self._get_exif(searched_file)
-
-                    # if unable to get exif data fallback to modification time
-                    if not file_creation_date:
-                        file_creation_date = self._get_modification_time(searched_file)
-
-                    # if media_type is returned with anything other than None
-                    if media_type:
-                        # get date modified and send to images
-                        if media_type == "Image":
-                            self._img_sorter(searched_file, file_creation_date)
-                            self.total_images += 1
-
-                        # get date modified and send to video
-                        elif media_type == "Video":
-                            self._video_sorter(searched_file, file_creation_date)
-                            self.total_videos += 1
-
-                    # if media_type is None, send to unknown folder location
-                    elif not media_type:
-                        self._unknown_sorter(searched_file, file_creation_date)
-                        self.total_unknown += 1
-
-            # update progress counter
-            progress += 1
+                if emit_progress and (
+                    progress % progress_step == 0 or progress == total_dir_files
+                ):
+                    emit_progress(
+                        {
+                            "string": f"Processing file {progress} of {total_dir_files_str}",
+                            "percent": f"{progress * inv_total_dir_files:.1%}",
+                        }
+                    )
+
+                # send to the matching media folder, anything else goes to unknown
+                base_dir = self._dest.get(media_type, self.unknown_dir)
+                self._sort(searched_file, file_creation_date, base_dir)
+                if base_dir is self.image_dir:
+                    self.total_images += 1
+                elif base_dir is self.video_dir:
+                    self.total_videos += 1
+                else:
+                    self.total_unknown += 1
+
+                # update progress counter
+                progress += 1
+
+        # write out any buffered exceptions now the directory is done
+        if self._error_log:
+            self._error_log.flush()
 
         # update callback with total info at the end of the directory search
-        if get_progress or callback:
-            callback(
+        if emit_progress:
+            emit_progress(
                 {
                     "total_images": str(self.total_images),
                     "total_videos": str(self.total_videos),
@@ -176,241 +265,281 @@ class ImageOrganizer:
                 }
             )
 
-    def _img_sorter(self, file, time):
+    def _inspect(self, walked_file):
         """
-        create folders if they don't exist and add them to a variable
+        determines the media type and date of a file, this doesn't touch the output folders so it is safe to run
+        on worker threads
 
-        :param file: image/video/unknown file
-        :param time: exif datetime or file date modified
-        :return: None
+        :param walked_file: (DirEntry, stat_result) tuple from _walk
+        :return: (file, media_type, file_creation_date) tuple
         """
-        get_year = str(time).split(" ")[0].split("-")[2]
-        Path(self.image_dir / get_year).mkdir(exist_ok=True)
+        entry, entry_stat = walked_file
+        searched_file = entry.path
 
-        get_month = str(month_name[int(str(time).split(" ")[0].split("-")[0])]).lower()
-        Path(self.image_dir / get_year / get_month).mkdir(exist_ok=True)
+        # determine media type
+        media_type = None
+        if not self.fast_parse:
+            header = self._read_header(searched_file)
+            media_type = self._check_filetype_magic(header)
+            if not media_type:
+                media_type = self._check_filetype_media_info(searched_file)
+        elif self.fast_parse:
+            media_type = self._check_filetype_mime(searched_file)
 
-        file_name = str(time + Path(file).suffix).lower()
-        date_dir_file = Path(
-            Path(self.image_dir / get_year / get_month) / str(file_name)
-        )
+        # attempt to get exif data
+        file_creation_date = self._get_exif(searched_file)
 
-        if not self.move_file:
-            if not Path(date_dir_file).exists():
-                copy2(src=Path(file), dst=Path(date_dir_file))
-            else:
-                new_file_name = self._check_for_dupes(
-                    self.image_dir, get_year, get_month, file_name
-                )
-                copy2(
-                    src=Path(file), dst=Path(Path(date_dir_file).parent / new_file_name)
-                )
-        elif self.move_file:
-            if not Path(date_dir_file).exists():
-                move(src=Path(file), dst=date_dir_file)
-            else:
-                new_file_name = self._check_for_dupes(
-                    self.image_dir, get_year, get_month, file_name
-                )
-                move(
-                    src=Path(file), dst=Path(Path(date_dir_file).parent / new_file_name)
-                )
+        # if unable to get exif data fallback to modification time
+        if not file_creation_date:
+            file_creation_date = self._get_modification_time(entry_stat)
 
-    def _video_sorter(self, file, time):
+        return searched_file, media_type, file_creation_date
+
+    def _inspect_all(self, executor, walked_files):
+        """
+        runs _inspect on the executor, keeping at most _MAX_PENDING files queued so the walk isn't read ahead
+        any further than needed
+
+        :param executor: ThreadPoolExecutor to run _inspect on
+        :param walked_files: iterable of (DirEntry, stat_result) tuples from _walk
+        :return: Generator of _inspect results in walk order
+        """
+        pending = deque()
+        for walked_file in walked_files:
+            pending.append(executor.submit(self._inspect, walked_file))
+            if len(pending) >= _MAX_PENDING:
+                yield pending.popleft().result()
+
+        while pending:
+            yield pending.popleft().result()
+
+    def _walk(self, dir_path, recursive_search: bool = True, sub_dir: bool = False):
+        """
+        walks dir_path with os.scandir, yielding each file along with the stat result scandir already holds
+
+        each directory is sorted on its own as it is walked, so only one directory listing per level is held
+        in memory. Sub directories that can't be read and files that vanish mid walk are logged and skipped
+
+        :param dir_path: Full path string/Pathlike object to walk.
+        :param recursive_search: If set to 'True' it will descend into all sub directories.
+        :param sub_dir: Set to 'True' when called for a sub directory of the parsed directory.
+        :return: Generator of (DirEntry, stat_result) tuples
+        """
+        try:
+            with os.scandir(dir_path) as scan:
+                entries = sorted(scan, key=lambda x: x.name)
+        except OSError as e:
+            if not sub_dir:
+                raise
+            self._log_exception(dir_path, e)
+            return
+
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                # never descend into the output folder, anything sorted into it would be found again
+                if recursive_search and (
+                    os.path.normcase(os.path.abspath(entry.path)) != self._output_path
+                ):
+                    yield from self._walk(entry.path, recursive_search, sub_dir=True)
+            elif entry.is_file(follow_symlinks=False) and "." in entry.name:
+                try:
+                    entry_stat = entry.stat(follow_symlinks=False)
+                except FileNotFoundError as e:
+                    self._log_exception(entry.path, e)
+                    continue
+                yield entry, entry_stat
+
+    def _sort(self, file, date_time, base_dir):
         """
-        create folders if they don't exist and add them to a variable
+        create folders if they don't exist and copy/move the file into them
 
         :param file: image/video/unknown file
-        :param time: exif datetime or file date modified
+        :param date_time: exif date taken or file date modified as a struct_time
+        :param base_dir: image/video/unknown directory to sort the file into
         :return: None
         """
-        get_year = str(time).split(" ")[0].split("-")[2]
-        Path(self.video_dir / get_year).mkdir(exist_ok=True)
+        get_year = str(date_time.tm_year)
+        get_month = _MONTHS[date_time.tm_mon - 1]
+
+        # only touch the file system the first time a year/month folder is seen
+        date_dir = os.path.join(base_dir, get_year, get_month)
+        if date_dir not in self._dest_index:
+            os.makedirs(date_dir, exist_ok=True)
+            self._index_date_dir(date_dir)
+        date_dir_names = self._dest_index[date_dir]
+
+        file_name = (
+            strftime(_FILE_NAME_FORMAT, date_time) + os.path.splitext(file)[1].lower()
+        )
+        if os.path.normcase(file_name) in date_dir_names:
+            file_name = self._check_for_dupes(date_dir, file_name)
 
-        get_month = str(month_name[int(str(time).split(" ")[0].split("-")[0])]).lower()
-        Path(self.video_dir / get_year / get_month).mkdir(exist_ok=True)
+        self._transfer(file, os.path.join(date_dir, file_name))
+        date_dir_names.add(os.path.normcase(file_name))
 
-        file_name = str(time + Path(file).suffix).lower()
-        date_dir_file = Path(
-            Path(self.video_dir / get_year / get_month) / str(file_name)
-        )
+    def _transfer(self, file, dst):
+        """
+        copies or moves file to dst, shutil.move already renames in place when it can and falls back to copying
 
+        :param file: image/video/unknown file
+        :param dst: full destination path
+        :return: None
+        """
         if not self.move_file:
-            if not Path(date_dir_file).exists():
-                copy2(src=Path(file), dst=date_dir_file)
-            else:
-                new_file_name = self._check_for_dupes(
-                    self.video_dir, get_year, get_month, file_name
-                )
-                copy2(
-                    src=Path(file), dst=Path(Path(date_dir_file).parent / new_file_name)
-                )
+            copy2(src=file, dst=dst)
         elif self.move_file:
-            if not Path(date_dir_file).exists():
-                move(src=Path(file), dst=date_dir_file)
-            else:
-                new_file_name = self._check_for_dupes(
-                    self.video_dir, get_year, get_month, file_name
-                )
-                move(
-                    src=Path(file), dst=Path(Path(date_dir_file).parent / new_file_name)
-                )
+            move(src=file, dst=dst)
 
-    def _unknown_sorter(self, file, time):
+    @staticmethod
+    def _read_header(file):
         """
-        create folders if they don't exist and add them to a variable
+        reads the start of a file in one sequential read for the signature check, this also leaves the start of
+        the file in the page cache if mediainfo has to parse it
 
         :param file: image/video/unknown file
-        :param time: exif datetime or file date modified
-        :return: None
+        :return: up to _HEADER_SIZE bytes, empty if the file can't be read
         """
-        get_year = str(time).split(" ")[0].split("-")[2]
-        Path(self.unknown_dir / get_year).mkdir(exist_ok=True)
+        try:
+            with open(file, "rb", buffering=_HEADER_SIZE) as f:
+                return f.read(_HEADER_SIZE)
+        except OSError:
+            return b""
 
-        get_month = str(month_name[int(str(time).split(" ")[0].split("-")[0])]).lower()
-        Path(self.unknown_dir / get_year / get_month).mkdir(exist_ok=True)
+    @staticmethod
+    def _check_filetype_magic(header):
+        """
+        identifies common image/video containers from their first bytes
 
-        file_name = str(time + Path(file).suffix).lower()
-        date_dir_file = Path(
-            Path(self.unknown_dir / get_year / get_month) / str(file_name)
-        )
+        :param header: start of the file from _read_header
+        :return: "Image", "Video" or None if the header isn't recognized
+        """
+        for magic, media_type in _MAGICS:
+            if header.startswith(magic):
+                return media_type
+
+        # FLV header flags (byte 4), audio only FLVs are left to mediainfo
+        if header.startswith(b"FLV\x01"):
+            if len(header) > 4 and header[4] & 0x01:
+                return "Video"
+            return None
 
-        if not self.move_file:
-            if not Path(date_dir_file).exists():
-                copy2(src=Path(file), dst=date_dir_file)
-            else:
-                new_file_name = self._check_for_dupes(
-                    self.unknown_dir, get_year, get_month, file_name
-                )
-                copy2(
-                    src=Path(file), dst=Path(Path(date_dir_file).parent / new_file_name)
-                )
-        elif self.move_file:
-            if not Path(date_dir_file).exists():
-                move(src=Path(file), dst=date_dir_file)
-            else:
-                new_file_name = self._check_for_dupes(
-                    self.unknown_dir, get_year, get_month, file_name
-                )
-                move(
-                    src=Path(file), dst=Path(Path(date_dir_file).parent / new_file_name)
-                )
+        if header.startswith(b"RIFF"):
+            return _RIFF_TYPES.get(header[8:12])
+
+        if header[4:8] == b"ftyp":
+            if header[8:12] in _FTYP_IMAGE_BRANDS:
+                return "Image"
+            elif header[8:12] in _FTYP_VIDEO_BRANDS:
+                return "Video"
+
+        return None
 
     def _check_filetype_media_info(self, file):
         try:
-            mi = MediaInfo.parse(
-                file,
-                mediainfo_options={"File_TestContinuousFileNames": "0"},
-                parse_speed=0.1,
-            )
+            with _MEDIA_INFO_LOCK:
+                mi = MediaInfo.parse(
+                    file,
+                    mediainfo_options={"File_TestContinuousFileNames": "0"},
+                    parse_speed=0.1,
+                )
             return mi.tracks[1].track_type
         except IndexError:
             return None
         except Exception as e:
-            with open(
-                Path(
-                    Path(self.working_dir)
-                    / Path(
-                        "exception_log "
-                        + str(datetime.now().strftime("%b-%d-%Y [%H.%M.%S]"))
-                        + ".txt"
-                    )
-                ),
-                "a",
-            ) as f:
-                f.write(str("\nFilename: " + str(file)) + "\n" + str(e) + "\n\n")
+            self._log_exception(file, e)
             return None
 
+    def _log_exception(self, file, exception):
+        """
+        writes an exception to this job's exception log, the log file is only created (and then kept open) once the
+        first exception happens
+
+        :param file: file that raised the exception
+        :param exception: the exception
+        :return: None
+        """
+        with self._error_log_lock:
+            if not self._error_log:
+                self._error_log = open(
+                    self._error_log_path, "a", buffering=1 << 16, encoding="utf-8"
+                )
+                atexit.register(self._error_log.close)
+
+            self._error_log.write(
+                "\nFilename: " + str(file) + "\n" + str(exception) + "\n\n"
+            )
+
     def _get_exif(self, file):
         try:
-            open_image = Image.open(file).getexif()
+            with Image.open(file) as open_image:
+                exif_date_time_original = (
+                    open_image.getexif()
+                    .get_ifd(_EXIF_IFD_TAG)
+                    .get(_DATE_TIME_ORIGINAL_TAG)
+                )
         except (UnidentifiedImageError, OSError):
             return None
         except Exception as e:
-            with open(
-                Path(
-                    Path(self.working_dir)
-                    / Path(
-                        "exception_log"
-                        + str(datetime.now().strftime("%b-%d-%Y [%H.%M.%S]"))
-                        + ".txt"
-                    )
-                ),
-                "a",
-            ) as f:
-                f.write(str("\nFilename: " + str(file)) + "\n" + str(e) + "\n\n")
+            self._log_exception(file, e)
             return None
 
-        exif_key = None
-        for exif_key, value in TAGS.items():
-            if value == "ExifOffset":
-                break
-        info = open_image.get_ifd(exif_key)
-
-        exif_dict = {
-            TAGS.get(exif_key, exif_key): value for exif_key, value in info.items()
-        }
-
-        if exif_dict:
+        if exif_date_time_original:
             try:
-                exif_date_time_original = str(exif_dict["DateTimeOriginal"]).replace(
-                    "\x00", ""
+                # "2013:10:01 09:17:50", zeroed out dates fail to parse and fall back
+                return strptime(
+                    str(exif_date_time_original).replace("\x00", "").strip(),
+                    "%Y:%m:%d %H:%M:%S",
                 )
-
-                if exif_date_time_original == "00-00-0000 [00:00:00]":
-                    return None
-
-                # convert from "2013:10:01 09:17:50" to "10-01-2013 [09.17.50]"
-                date_month = str(exif_date_time_original).split(" ")[0].split(":")
-                date_time = str(exif_date_time_original).split(" ")[1].replace(":", ".")
-                return (
-                    date_month[1]
-                    + "-"
-                    + date_month[2]
-                    + "-"
-                    + date_month[0]
-                    + " "
-                    + "["
-                    + date_time
-                    + "]"
-                )
-            except (KeyError, IndexError):
+            except ValueError:
                 return None
 
-    @staticmethod
-    def _check_for_dupes(file_dir, get_year, get_month, file_name):
-        get_last_dupe = None
-        for x in sorted(
-            Path(Path(file_dir / get_year / get_month)).glob("*.*"), reverse=True
-        ):
-            get_last_dupe = re.search(r"\((\d+)\)", str(x))
-
-        dupe = ""
-        if get_last_dupe:
-            dupe = "(" + str(int(get_last_dupe.group(1)) + 1) + ")"
-        elif not get_last_dupe:
-            dupe = "(1)"
-
-        return Path(
-            str(Path(Path(file_name).name).with_suffix(""))
-            + str(dupe)
-            + str(Path(file_name).suffix)
-        )
+    def _index_date_dir(self, date_dir):
+        """
+        lists the file names already in date_dir and its highest duplicate counter, after this collisions are
+        checked in memory instead of with a stat per file
+
+        :param date_dir: year/month folder the files are being sorted into
+        :return: None
+        """
+        file_names = set()
+        last_dupe = 0
+        with os.scandir(date_dir) as scan:
+            for entry in scan:
+                file_names.add(os.path.normcase(entry.name))
+
+                # most names have no counter, skip the regex call for them
+                if ")" in entry.name:
+                    found_dupe = _DUPE_RE.search(entry.name)
+                    if found_dupe:
+                        last_dupe = max(last_dupe, int(found_dupe.group(1)))
+
+        self._dest_index[date_dir] = file_names
+        self._dupe_counters[date_dir] = last_dupe
+
+    def _check_for_dupes(self, date_dir, file_name):
+        """
+        returns file_name with the next free duplicate counter for date_dir, e.g. "name(2).jpg"
+
+        :param date_dir: year/month folder the file is being sorted into
+        :param file_name: file name that already exists in date_dir
+        :return: the new file name
+        """
+        self._dupe_counters[date_dir] += 1
+        dupe = "(" + str(self._dupe_counters[date_dir]) + ")"
+
+        file_stem, file_suffix = os.path.splitext(file_name)
+        return file_stem + dupe + file_suffix
 
     @staticmethod
-    def _get_modification_time(file):
-        return (
-            datetime.fromtimestamp(Path(file).stat().st_mtime)
-            .replace(microsecond=0)
-            .strftime("%m-%d-%Y [%H.%M.%S]")
-        )
+    def _get_modification_time(file_stat):
+        return localtime(file_stat.st_mtime)
 
     @staticmethod
     def _check_filetype_mime(file):
-        parse_mime = mimetypes.guess_type(file)
-        if "image" in str(parse_mime):
+        parse_mime = _mime_for_suffix(os.path.splitext(file)[1].lower())
+        if parse_mime.startswith("image"):
             return "Image"
-        elif "video" in str(parse_mime):
+        elif parse_mime.startswith("video"):
             return "Video"
         else:
             return None